@@ -1,15 +1,250 @@
-from typing import Dict, List
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from pydantic import BaseModel, Field
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from firecrawl import FirecrawlApp
 import streamlit as st
 import os
+import time
+import types
+import functools
+import logging
+import threading
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential
+from diskcache import Cache
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import httpx
+    import tiktoken
+    from agno.agent import Agent
+    from firecrawl import FirecrawlApp
+
 # Load environment variables from .env file if it exists
 load_dotenv()
 
+# An unknown LOG_LEVEL falls back to WARNING instead of failing at import
+log_level = logging.getLevelName(os.getenv("LOG_LEVEL", "WARNING").upper())
+logging.basicConfig(level=log_level if isinstance(log_level, int) else logging.WARNING)
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
+def _lazy_imports() -> types.SimpleNamespace:
+    """Import the LLM and scraping SDKs on first use, so the UI renders before they load"""
+    import httpx
+    import tiktoken
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+    from firecrawl import FirecrawlApp
+    return types.SimpleNamespace(
+        httpx=httpx,
+        tiktoken=tiktoken,
+        Agent=Agent,
+        OpenAIChat=OpenAIChat,
+        FirecrawlApp=FirecrawlApp
+    )
+
+# Maximum number of URLs sent in one Firecrawl batch scrape request
+FIRECRAWL_BATCH_SIZE = int(os.getenv("FIRECRAWL_BATCH_SIZE", "10"))
+# Seconds between batch scrape status checks
+FIRECRAWL_POLL_INTERVAL = 2
+# Concurrent per-URL scrapes when the batch endpoint is unavailable
+FIRECRAWL_MAX_WORKERS = 3
+# Batch scrape statuses meaning the endpoint isn't available on this plan, so URLs are scraped one by one
+BATCH_UNAVAILABLE_STATUSES = (404, 405)
+# Attempts per Firecrawl call when rate limited, and the longest backoff between them
+FIRECRAWL_MAX_ATTEMPTS = 4
+FIRECRAWL_MAX_BACKOFF = 30
+# Start spacing out requests once this few remain in the current rate limit window
+RATE_LIMIT_LOW_WATERMARK = 3
+
+# Job postings change at most about once a day, so scrapes and analyses are cached on disk
+CACHE_DIR = os.getenv("JOBHUNT_CACHE_DIR", "/tmp/jobhunt-cache")
+CACHE_TTL = int(os.getenv("JOBHUNT_CACHE_TTL", "86400"))
+cache = Cache(CACHE_DIR)
+
+# Translation table used to turn search terms into URL slugs
+_SLUG_TABLE = str.maketrans({' ': '-'})
+
+def _slug(value: str) -> str:
+    """Lowercase a search term and replace spaces with dashes for use in job site URLs"""
+    return value.lower().translate(_SLUG_TABLE)
+
+def _cache_key(*parts) -> str:
+    """Build a stable cache key from JSON-serializable parts"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+# Models offered in the sidebar; the analysis is plain summarization, so a non-reasoning model is the default
+MODEL_OPTIONS = ["gpt-4o-mini", "gpt-4.1-mini", "o3-mini"]
+# Upper bound on generated tokens per analysis, which dominates end-to-end latency
+MAX_OUTPUT_TOKENS = 1500
+# Limits on the scraped data embedded in each analysis prompt, which drives time to first token
+MAX_PROMPT_ITEMS = 10
+MAX_PROMPT_FIELD_CHARS = 300
+PROMPT_TOKEN_BUDGET = 3000
+# Fields kept whole because a truncated link would be rendered as a broken "View job posting"
+UNTRUNCATED_PROMPT_FIELDS = ('job_link',)
+# Missing values dropped from prompt records; falsy data such as a 0.0 growth rate is kept
+EMPTY_PROMPT_VALUES = (None, "", [], {})
+# USD per million (input, output) tokens, used to show the cost of each analysis
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "o3-mini": (1.10, 4.40),
+}
+
+# OpenAI endpoint used to pre-establish the pooled connection, honoring the SDK's base URL override
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# Headers for the shared keep-alive sessions to the Firecrawl and OpenAI APIs
+HTTP_HEADERS = {'Connection': 'keep-alive', 'Accept-Encoding': 'gzip, deflate'}
+# Seconds an idle pooled OpenAI connection stays open, so it survives while the user fills in the form
+HTTP_KEEPALIVE_EXPIRY = 180
+
+def _header_float(response: requests.Response, name: str) -> Optional[float]:
+    """Read a numeric response header, returning None when it is missing or malformed"""
+    try:
+        return float(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+def _is_rate_limited(exception: BaseException) -> bool:
+    """Whether a Firecrawl call failed with 429 Too Many Requests"""
+    return (
+        isinstance(exception, requests.exceptions.HTTPError)
+        and exception.response is not None
+        and exception.response.status_code == 429
+    )
+
+def _handle_rate_limit(response: requests.Response, *args, throttle: threading.local, **kwargs) -> None:
+    """Session response hook: raise on 429 and throttle when the rate limit window is nearly used up
+
+    `throttle.sleep` is the sleep function of the Firecrawl call in progress on this thread.
+    """
+    if response.status_code == 429:
+        raise requests.exceptions.HTTPError("Rate limited by Firecrawl (429 Too Many Requests)", response=response)
+    
+    remaining = _header_float(response, 'X-RateLimit-Remaining')
+    reset = _header_float(response, 'X-RateLimit-Reset')
+    if remaining is not None and reset is not None and remaining < RATE_LIMIT_LOW_WATERMARK:
+        # Spread the requests left in this window over the time until it resets
+        wait = min(max(0, reset - time.time()) / max(remaining, 1), FIRECRAWL_MAX_BACKOFF)
+        getattr(throttle, 'sleep', time.sleep)(wait)
+
+# Query parameters that only track where a click came from, ignored when comparing job links
+TRACKING_PARAM_PREFIXES = ('utm_', 'ref', 'src', 'trk')
+
+def _normalize_link(link: str) -> str:
+    """Normalize a job link so the same posting reached through different URLs compares equal"""
+    parts = urlsplit(link.strip())
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+def _dedupe_jobs(jobs: List[Dict]) -> List[Dict]:
+    """Drop reposted jobs, matching on normalized link, or on case-insensitive (job_title, region) for unlinked ones
+
+    Regions are broad areas and postings carry no company, so linked postings are never merged on title alone.
+    """
+    seen_links = set()
+    seen_titles = set()
+    unique = []
+    for job in jobs:
+        title_key = (job['job_title'].casefold(), (job.get('region') or '').casefold()) if job.get('job_title') else None
+        if job.get('job_link'):
+            link_key = _normalize_link(job['job_link'])
+            if link_key in seen_links:
+                continue
+            seen_links.add(link_key)
+        elif title_key is not None and title_key in seen_titles:
+            continue
+        if title_key is not None:
+            seen_titles.add(title_key)
+        unique.append(job)
+    return unique
+
+def _merge_extracts(extracts: List[Dict]) -> Dict[str, List[Dict]]:
+    """Merge per-page extract results, dropping duplicate job postings across sites"""
+    results = {'job_postings': [], 'industry_trends': []}
+    for extracted in extracts:
+        for key in results:
+            results[key].extend(extracted.get(key) or [])
+    results['job_postings'] = _dedupe_jobs(results['job_postings'])
+    return results
+
+_exponential_backoff = wait_exponential(multiplier=1, max=FIRECRAWL_MAX_BACKOFF)
+
+def _rate_limit_wait(retry_state) -> float:
+    """Wait for Firecrawl's Retry-After when given, otherwise back off exponentially"""
+    retry_after = _header_float(retry_state.outcome.exception().response, 'Retry-After')
+    if retry_after is not None:
+        return min(retry_after, FIRECRAWL_MAX_BACKOFF)
+    return _exponential_backoff(retry_state)
+
+def _pooled_post_request(self, url: str, data: Dict, headers: Dict[str, str], retries: int = 3, backoff_factor: float = 0.5) -> requests.Response:
+    """FirecrawlApp._post_request replacement that reuses the app's keep-alive session"""
+    for attempt in range(retries):
+        response = self._session.post(url, headers=headers, json=data)
+        if response.status_code != 502:
+            return response
+        time.sleep(backoff_factor * (2 ** attempt))
+    return response
+
+def _pooled_get_request(self, url: str, headers: Dict[str, str], retries: int = 3, backoff_factor: float = 0.5) -> requests.Response:
+    """FirecrawlApp._get_request replacement that reuses the app's keep-alive session"""
+    for attempt in range(retries):
+        response = self._session.get(url, headers=headers)
+        if response.status_code != 502:
+            return response
+        time.sleep(backoff_factor * (2 ** attempt))
+    return response
+
+def create_firecrawl_app(api_key: str) -> "FirecrawlApp":
+    """Create a FirecrawlApp whose API requests share one pooled keep-alive session"""
+    session = requests.Session()
+    session.headers.update(HTTP_HEADERS)
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+    # The app outlives this script run in st.cache_resource, so the hook keeps its state on the app, not in globals
+    throttle = threading.local()
+    session.hooks['response'].append(functools.partial(_handle_rate_limit, throttle=throttle))
+    
+    app = _lazy_imports().FirecrawlApp(api_key=api_key)
+    # The SDK calls requests.post/get directly, opening a new connection per request
+    app._session = session
+    app._throttle = throttle
+    app._post_request = types.MethodType(_pooled_post_request, app)
+    app._get_request = types.MethodType(_pooled_get_request, app)
+    return app
+
+def create_http_client() -> "httpx.Client":
+    """Create the pooled HTTP/2 client the OpenAI models send their requests through"""
+    httpx = _lazy_imports().httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+        http2=True,
+        headers=HTTP_HEADERS
+    )
+
+def warm_up(firecrawl: "FirecrawlApp", http_client: "httpx.Client") -> None:
+    """Open the pooled Firecrawl and OpenAI connections ahead of the first search
+
+    Only the TCP+TLS handshake matters here, so the responses (typically 401/404) are ignored.
+    """
+    try:
+        firecrawl._session.head(f"{firecrawl.api_url}/v1/health", timeout=5)
+    except Exception as e:
+        logger.debug("Firecrawl warmup failed: %s", e)
+    try:
+        http_client.head(f"{OPENAI_BASE_URL}/models", timeout=5)
+    except Exception as e:
+        logger.debug("OpenAI warmup failed: %s", e)
+
 class NestedModel1(BaseModel):
     """Schema for job posting data"""
     region: str = Field(description="Region or area where the job is located", default=None)
@@ -33,6 +268,50 @@ class IndustryTrendsSchema(BaseModel):
     """Schema for industry trends extraction"""
     industry_trends: List[IndustryTrend] = Field(description="List of industry trends")
 
+class CombinedSchema(BaseModel):
+    """Schema for extracting job postings and industry trends in a single batch"""
+    job_postings: List[NestedModel1] = Field(description="List of job postings", default_factory=list)
+    industry_trends: List[IndustryTrend] = Field(description="List of industry trends", default_factory=list)
+
+class SelectedJob(BaseModel):
+    """Schema for a job picked by the job analysis"""
+    job_title: str = Field(description="Title of the job position")
+    role: str = Field(description="Specific role or function within the job category")
+    region: str = Field(description="Region or location of the job")
+    experience: str = Field(description="Experience required for the position")
+    pros: List[str] = Field(description="Reasons this job suits the user")
+    cons: List[str] = Field(description="Drawbacks of this job for the user")
+    # Required but nullable, since strict structured outputs need every field present and not all postings have a link
+    job_link: Optional[str] = Field(description="Link to the job posting, or null if the posting has none")
+
+class JobAnalysis(BaseModel):
+    """Schema for the structured job analysis returned by the LLM"""
+    selected: List[SelectedJob] = Field(description="The 5-6 jobs that best match the user")
+    skills_match: List[str] = Field(description="Comparison of the selected jobs on skills match, experience requirements and growth potential")
+    recommendations: List[str] = Field(description="Top 3 jobs with reasoning, career growth potential and points to consider before applying")
+    tips: List[str] = Field(description="Job-specific application strategies and resume customization tips")
+
+class UsageMetrics(BaseModel):
+    """Latency, token and cost metrics recorded for one analysis run"""
+    cached: bool = False
+    ttft: Optional[float] = None
+    duration: Optional[float] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    def summary(self) -> str:
+        """One-line summary for display under the analysis"""
+        if self.cached:
+            return "⚡ Served from cache"
+        if self.duration is None:
+            return ""
+        # Generation rate excludes the wait for the first token, when there was one to measure
+        generation_time = self.duration - self.ttft if self.ttft and self.duration > self.ttft else self.duration
+        tokens_per_second = self.output_tokens / generation_time if generation_time else 0
+        ttft = f"TTFT {self.ttft * 1000:.0f}ms · " if self.ttft is not None else ""
+        return f"{ttft}{self.duration:.1f}s · {self.output_tokens} tokens · {tokens_per_second:.0f} tok/s · ${self.cost:.4f}"
+
 class FirecrawlResponse(BaseModel):
     """Schema for Firecrawl API response"""
     success: bool
@@ -40,209 +319,504 @@ class FirecrawlResponse(BaseModel):
     status: str
     expiresAt: str
 
+# JSON schema sent with every batch extract request, generated once at import time
+COMBINED_SCHEMA_JSON = CombinedSchema.model_json_schema()
+
+EXTRACT_PROMPT = """These pages are either job listing pages or salary research pages.
+
+From job listing pages, extract job postings by region, roles, job titles, and experience.
+Look for jobs that match these criteria:
+- Job Title: Should be related to {job_title}
+- Location: {location} (include remote jobs if available)
+- Experience: Around {experience_years} years
+- Skills: Should match at least some of these skills: {skills}
+- Job Type: Full-time, Part-time, Contract, Temporary, Internship
+
+For each job posting, extract:
+- region: The broader region or area where the job is located (e.g., "Northeast", "West Coast", "Midwest")
+- role: The specific role or function (e.g., "Frontend Developer", "Data Analyst")
+- job_title: The exact title of the job
+- experience: The experience requirement in years or level (e.g., "3-5 years", "Senior")
+- job_link: The link to the job posting
+
+From salary research pages, extract industry trends data for the {job_category} industry.
+For each industry trend, extract:
+- industry: The specific industry or sub-category
+- avg_salary: The average salary in this industry (as a number)
+- growth_rate: The growth rate of this industry (as a number)
+- demand_level: The demand level (e.g., "High", "Medium", "Low")
+- top_skills: A list of top skills in demand for this industry
+
+IMPORTANT:
+- Return data for at least 3 different job opportunities. MAXIMUM 10.
+- Extract trends for at least 3-5 different roles or sub-categories within the industry
+- Leave a list empty if the page has no matching data
+"""
+
+# Static role and formatting rules, configured once per agent as its system message. Keeping them
+# in a stable prefix lets providers with prompt caching reuse it, and each run only sends the data.
+SYSTEM_PROMPT = "You are a career expert who helps find and analyze job opportunities based on user preferences."
+
+JOB_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+You are given job postings in JSON format together with the user's criteria.
+
+**IMPORTANT INSTRUCTIONS:**
+1. ONLY analyze jobs from the given JSON data that match the user's criteria (job title, location/region, experience, skills and job type: Full-time, Part-time, Contract, Temporary, Internship)
+2. DO NOT create new job listings
+3. From the matching jobs, select 5-6 jobs that best match the user's skills and experience
+
+Respond with JSON only, filling in:
+- selected: the 5-6 best matching jobs, each with its title, role, region, experience, pros, cons and link
+- skills_match: short points comparing the selected jobs on skills match, experience requirements and growth potential
+- recommendations: the top 3 jobs with reasoning, career growth potential and points to consider before applying
+- tips: job-specific application strategies and resume customization tips
+
+Keep every point to one short sentence.
+"""
+
+TRENDS_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+You are given industry trends data in JSON format for one industry. Please provide:
+1. A bullet-point summary of the salary and demand trends
+2. Identify the top skills in demand for this industry
+3. Career growth opportunities:
+   - Roles with highest growth potential
+   - Emerging specializations
+   - Skills with increasing demand
+4. Specific advice for job seekers based on these trends
+
+Use markdown and format the response as follows:
+
+📊 INDUSTRY TRENDS SUMMARY
+• [Bullet points for salary and demand trends]
+
+🔥 TOP SKILLS IN DEMAND
+• [Bullet points for most sought-after skills]
+
+📈 CAREER GROWTH OPPORTUNITIES
+• [Bullet points with growth insights]
+
+🎯 RECOMMENDATIONS FOR JOB SEEKERS
+• [Bullet points with specific advice]
+"""
+
+JOB_ANALYSIS_PROMPT = """Analyze these jobs: {jobs}
+User criteria: Job Title: {job_title}; Location: {location}; Experience: {experience_years} years; Skills: {skills}"""
+
+TRENDS_ANALYSIS_PROMPT = """Analyze these industry trends for {job_category}: {industries}"""
+
 class JobHuntingAgent:
     """Agent responsible for finding jobs and providing recommendations"""
     
-    def __init__(self, firecrawl_api_key: str, openai_api_key: str, model_id: str = "o3-mini"):
-        self.agent = Agent(
-            model=OpenAIChat(id=model_id, api_key=openai_api_key),
-            markdown=True,
-            description="I am a career expert who helps find and analyze job opportunities based on user preferences."
+    def __init__(
+        self,
+        firecrawl_api_key: str,
+        openai_api_key: str,
+        model_id: str = MODEL_OPTIONS[0],
+        http_client: Optional["httpx.Client"] = None,
+        firecrawl: Optional["FirecrawlApp"] = None
+    ):
+        self.model_id = model_id
+        # Both agents share one pooled HTTP/2 client so OpenAI calls skip the TLS handshake
+        self.http_client = http_client or create_http_client()
+        # Jobs are analyzed into a JobAnalysis so the fixed headers are rendered by the UI, not generated
+        self.agent = self._create_agent(
+            openai_api_key, model_id, self.http_client,
+            system_message=JOB_SYSTEM_PROMPT,
+            response_model=JobAnalysis,
+            structured_outputs=True
+        )
+        # Industry trends are analyzed concurrently with jobs, so they get their own agent run state
+        self.trends_agent = self._create_agent(
+            openai_api_key, model_id, self.http_client,
+            system_message=TRENDS_SYSTEM_PROMPT
         )
-        self.firecrawl = FirecrawlApp(api_key=firecrawl_api_key)
+        self.firecrawl = firecrawl or create_firecrawl_app(firecrawl_api_key)
 
-    def find_jobs(
-        self, 
+    @functools.cached_property
+    def encoding(self) -> "tiktoken.Encoding":
+        """Tokenizer for the selected model, loaded on first use since it may have to be downloaded"""
+        tiktoken = _lazy_imports().tiktoken
+        try:
+            return tiktoken.encoding_for_model(self.model_id)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+
+    def _count_tokens(self, text: str) -> int:
+        """Count tokens in scraped or generated text, which may contain special-token strings like <|endoftext|>"""
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    @staticmethod
+    def _create_agent(openai_api_key: str, model_id: str, http_client: "httpx.Client", **agent_kwargs) -> "Agent":
+        """Create the career expert agent used for analysis"""
+        lazy = _lazy_imports()
+        if model_id.startswith("o3"):
+            # Reasoning models spend hidden output tokens thinking, so keep that effort low
+            model = lazy.OpenAIChat(
+                id=model_id,
+                api_key=openai_api_key,
+                http_client=http_client,
+                reasoning_effort="low",
+                max_completion_tokens=MAX_OUTPUT_TOKENS
+            )
+        else:
+            model = lazy.OpenAIChat(
+                id=model_id,
+                api_key=openai_api_key,
+                http_client=http_client,
+                max_tokens=MAX_OUTPUT_TOKENS
+            )
+        return lazy.Agent(model=model, **agent_kwargs)
+
+    def _compact(self, records: List[Dict], max_items: int = MAX_PROMPT_ITEMS) -> str:
+        """Serialize records as compact JSON, dropping empty fields and items until it fits the token budget"""
+        records = [
+            {
+                k: v[:MAX_PROMPT_FIELD_CHARS] if isinstance(v, str) and k not in UNTRUNCATED_PROMPT_FIELDS else v
+                for k, v in record.items()
+                if v not in EMPTY_PROMPT_VALUES
+            }
+            for record in records[:max_items]
+        ]
+        while True:
+            payload = orjson.dumps(records[:max_items], option=orjson.OPT_NON_STR_KEYS).decode()
+            if max_items <= 1 or self._count_tokens(payload) <= PROMPT_TOKEN_BUDGET:
+                return payload
+            max_items -= 1
+
+    def _record_usage(self, usage: UsageMetrics, metrics: Optional[Dict], prompt: str, content: str, started: float) -> None:
+        """Fill in token counts and cost from a run's response metrics, counting locally if usage wasn't reported"""
+        usage.duration = time.perf_counter() - started
+        # agno aggregates the usage OpenAI reports into per-message lists
+        metrics = metrics or {}
+        usage.input_tokens = sum(metrics.get('input_tokens', [])) or self._count_tokens(prompt)
+        usage.output_tokens = sum(metrics.get('output_tokens', [])) or self._count_tokens(content)
+        input_price, output_price = MODEL_PRICING.get(self.model_id, (0.0, 0.0))
+        usage.cost = (usage.input_tokens * input_price + usage.output_tokens * output_price) / 1_000_000
+
+    def _run_structured(self, agent: "Agent", prompt: str, usage: Optional[UsageMetrics] = None) -> BaseModel:
+        """Run an agent with a response_model on a prompt, serving repeat prompts from the disk cache"""
+        usage = usage if usage is not None else UsageMetrics()
+        key = _cache_key("analysis", self.model_id, agent.system_message, agent.response_model.__name__, prompt)
+        cached = cache.get(key)
+        if cached is not None:
+            usage.cached = True
+            return agent.response_model.model_validate(cached)
+        
+        started = time.perf_counter()
+        response = agent.run(prompt)
+        content = response.content
+        if not isinstance(content, agent.response_model):
+            raise ValueError("The model response could not be parsed as structured output")
+        self._record_usage(usage, response.metrics, prompt, content.model_dump_json(), started)
+        
+        cache.set(key, content.model_dump(), expire=CACHE_TTL, tag="analysis")
+        return content
+
+    def _stream_content(self, agent: "Agent", prompt: str, stream: bool = True, usage: Optional[UsageMetrics] = None) -> Iterator[str]:
+        """Run the agent on a prompt and yield its response content, chunk by chunk when streaming"""
+        usage = usage if usage is not None else UsageMetrics()
+        key = _cache_key("analysis", self.model_id, agent.system_message, prompt)
+        cached = cache.get(key)
+        if cached is not None:
+            usage.cached = True
+            yield cached
+            return
+        
+        started = time.perf_counter()
+        if not stream:
+            response = agent.run(prompt)
+            content = response.content
+            yield content
+            metrics = response.metrics
+        else:
+            chunks = []
+            for chunk in agent.run(prompt, stream=True):
+                if chunk.content:
+                    if not chunks:
+                        usage.ttft = time.perf_counter() - started
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            content = "".join(chunks)
+            # Streamed chunks don't carry usage; agno totals it on run_response once the stream ends,
+            # and the agent is built per search so that run_response is this run's
+            metrics = agent.run_response.metrics if agent.run_response else None
+        self._record_usage(usage, metrics, prompt, content, started)
+        
+        cache.set(key, content, expire=CACHE_TTL, tag="analysis")
+
+    def search(
+        self,
         job_title: str,
         location: str,
         experience_years: int,
-        skills: List[str]
-    ) -> str:
-        """Find and analyze jobs based on user preferences"""
-        formatted_job_title = job_title.lower().replace(" ", "-")
-        formatted_location = location.lower().replace(" ", "-")
+        skills: List[str],
+        job_category: str,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> Dict[str, List[Dict]]:
+        """Scrape job postings and industry trends from all sites in a single batch
+
+        `sleep` is called to wait out rate limit backoffs, so callers can show progress meanwhile.
+        """
+        formatted_job_title = _slug(job_title)
+        formatted_location = _slug(location)
+        category_slug = _slug(job_category)
+        category_underscored = job_category.replace(" ", "_")
+        category_length = len(job_category)
         skills_string = ", ".join(skills)
         
         urls = [
             f"https://www.naukri.com/{formatted_job_title}-jobs-in-{formatted_location}",
             f"https://www.indeed.com/jobs?q={formatted_job_title}&l={formatted_location}",
             f"https://www.monster.com/jobs/search/?q={formatted_job_title}&where={formatted_location}",
+            f"https://www.payscale.com/research/US/Job={category_underscored}/Salary",
+            f"https://www.glassdoor.com/Salaries/{category_slug}-salary-SRCH_KO0,{category_length}.htm"
         ]
         
-        print(f"Searching for jobs with URLs: {urls}")
+        logger.info("Searching for jobs and industry trends with URLs: %s", urls)
         
+        results = self._cached_extract(
+            urls,
+            prompt=EXTRACT_PROMPT.format(
+                job_title=job_title,
+                location=location,
+                experience_years=experience_years,
+                skills=skills_string,
+                job_category=job_category
+            ),
+            schema=COMBINED_SCHEMA_JSON,
+            sleep=sleep
+        )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processed Jobs: %s", results['job_postings'])
+            logger.debug("Processed Industry Trends: %s", results['industry_trends'])
+        
+        return results
+
+    def _cached_extract(self, urls: List[str], prompt: str, schema: Dict, sleep: Callable[[float], None] = time.sleep) -> Dict[str, List[Dict]]:
+        """Return the batch extract results for these urls, serving repeat searches from the disk cache"""
+        key = _cache_key("firecrawl", urls, prompt, schema)
+        results = cache.get(key)
+        if results is None:
+            try:
+                results = self._batch_extract(urls, prompt, schema, sleep)
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code not in BATCH_UNAVAILABLE_STATUSES:
+                    raise
+                logger.warning("Batch scrape unavailable, scraping URLs individually: %s", e)
+                results = self._parallel_extract(urls, prompt, schema)
+            cache.set(key, results, expire=CACHE_TTL, tag="firecrawl")
+        return results
+
+    def _with_backoff(self, call: Callable, *args, sleep: Callable[[float], None] = time.sleep):
+        """Make a Firecrawl call, retrying with backoff while it is rate limited
+
+        `sleep` also serves the response hook's throttling, so every wait shows the same progress.
+        """
+        self.firecrawl._throttle.sleep = sleep
         try:
-            raw_response = self.firecrawl.extract(
-                urls=urls,
-                params={
-                    'prompt': f"""Extract job postings by region, roles, job titles, and experience from these job sites.
-                    
-                    Look for jobs that match these criteria:
-                    - Job Title: Should be related to {job_title}
-                    - Location: {location} (include remote jobs if available)
-                    - Experience: Around {experience_years} years
-                    - Skills: Should match at least some of these skills: {skills_string}
-                    - Job Type: Full-time, Part-time, Contract, Temporary, Internship
-                    
-                    For each job posting, extract:
-                    - region: The broader region or area where the job is located (e.g., "Northeast", "West Coast", "Midwest")
-                    - role: The specific role or function (e.g., "Frontend Developer", "Data Analyst")
-                    - job_title: The exact title of the job
-                    - experience: The experience requirement in years or level (e.g., "3-5 years", "Senior")
-                    - job_link: The link to the job posting
-                    
-                    IMPORTANT: Return data for at least 3 different job opportunities. MAXIMUM 10.
-                    """,
-                    'schema': ExtractSchema.model_json_schema()
-                }
-            )
-            
-            print("Raw Job Response:", raw_response)
-            
-            if isinstance(raw_response, dict) and raw_response.get('success'):
-                jobs = raw_response['data'].get('job_postings', [])
-            else:
-                jobs = []
-                
-            print("Processed Jobs:", jobs)
+            for attempt in Retrying(
+                retry=retry_if_exception(_is_rate_limited),
+                wait=_rate_limit_wait,
+                stop=stop_after_attempt(FIRECRAWL_MAX_ATTEMPTS),
+                sleep=sleep,
+                reraise=True
+            ):
+                with attempt:
+                    return call(*args)
+        finally:
+            del self.firecrawl._throttle.sleep
+
+    def _batch_extract(self, urls: List[str], prompt: str, schema: Dict, sleep: Callable[[float], None] = time.sleep) -> Dict[str, List[Dict]]:
+        """Run one Firecrawl batch scrape per FIRECRAWL_BATCH_SIZE urls and merge the extracted lists"""
+        params = {
+            'formats': ['extract'],
+            'extract': {'schema': schema, 'prompt': prompt}
+        }
+        
+        # Start every batch before polling so they are processed in parallel on Firecrawl's side
+        batch_ids = [
+            self._with_backoff(self.firecrawl.async_batch_scrape_urls, urls[i:i + FIRECRAWL_BATCH_SIZE], params, sleep=sleep)['id']
+            for i in range(0, len(urls), FIRECRAWL_BATCH_SIZE)
+        ]
+        
+        extracts = []
+        for batch_id in batch_ids:
+            while True:
+                raw_response = self._with_backoff(self.firecrawl.check_batch_scrape_status, batch_id, sleep=sleep)
+                if raw_response['status'] not in ['scraping', 'pending', 'queued', 'waiting']:
+                    break
+                time.sleep(FIRECRAWL_POLL_INTERVAL)
             
-            if not jobs:
-                return "No job listings found matching your criteria. Try adjusting your search parameters or try different job sites."
+            # Batch responses carry every scraped page, so only format them when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Raw Batch Response: %s", raw_response)
             
-            analysis = self.agent.run(
-                f"""As a career expert, analyze these job opportunities:
-
-                Jobs Found in json format:
-                {jobs}
-
-                **IMPORTANT INSTRUCTIONS:**
-                1. ONLY analyze jobs from the above JSON data that match the user's requirements:
-                   - Job Title: Related to {job_title}
-                   - Location/Region: Near {location}
-                   - Experience: Around {experience_years} years
-                   - Skills: {skills_string}
-                   - Job Type: Full-time, Part-time, Contract, Temporary, Internship
-                2. DO NOT create new job listings
-                3. From the matching jobs, select 5-6 jobs that best match the user's skills and experience
-
-                Please provide your analysis in this format:
-                
-                💼 SELECTED JOB OPPORTUNITIES
-                • List only 5-6 best matching jobs
-                • For each job include:
-                  - Job Title and Role
-                  - Region/Location
-                  - Experience Required
-                  - Pros and Cons
-                  - Job Link
-                🔍 SKILLS MATCH ANALYSIS
-                • Compare the selected jobs based on:
-                  - Skills match with user's profile
-                  - Experience requirements
-                  - Growth potential
-
-                💡 RECOMMENDATIONS
-                • Top 3 jobs from the selection with reasoning
-                • Career growth potential
-                • Points to consider before applying
-
-                📝 APPLICATION TIPS
-                • Job-specific application strategies
-                • Resume customization tips for these roles
-
-                Format your response in a clear, structured way using the above sections.
-                """
-            )
+            if raw_response['status'] != 'completed':
+                raise Exception(f"Batch scrape {raw_response['status']}. Error: {raw_response.get('error')}")
             
-            return analysis.content
-        except Exception as e:
-            print(f"Error in find_jobs: {str(e)}")
-            return f"An error occurred while searching for jobs: {str(e)}\n\nPlease try again with different search parameters or check if the job sites are supported by Firecrawl."
+            extracts.extend(document.get('extract') or {} for document in raw_response.get('data') or [])
+        
+        return _merge_extracts(extracts)
 
-    def get_industry_trends(self, job_category: str) -> str:
-        """Get trends for the specified job category/industry"""
-        urls = [
-            f"https://www.payscale.com/research/US/Job={job_category.replace(' ', '_')}/Salary",
-            f"https://www.glassdoor.com/Salaries/{job_category.lower().replace(' ', '-')}-salary-SRCH_KO0,{len(job_category)}.htm"
-        ]
+    def _parallel_extract(self, urls: List[str], prompt: str, schema: Dict) -> Dict[str, List[Dict]]:
+        """Scrape each url on its own across a bounded thread pool, for plans without the batch endpoint"""
+        params = {
+            'formats': ['extract'],
+            'extract': {'schema': schema, 'prompt': prompt}
+        }
+        
+        extracts = []
+        last_error = None
+        with ThreadPoolExecutor(max_workers=FIRECRAWL_MAX_WORKERS) as executor:
+            # Worker threads can't draw Streamlit progress, so their backoffs use the plain time.sleep
+            futures = {executor.submit(self._with_backoff, self._scrape_url, url, params): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    extracts.append(future.result().get('extract') or {})
+                except Exception as e:
+                    # One blocked or throttled site shouldn't sink the whole search
+                    logger.warning("Error scraping %s: %s", futures[future], e)
+                    last_error = e
+        
+        # Raise rather than return empty results when nothing was scraped, so the failure isn't cached
+        if not extracts:
+            raise Exception(f"Failed to scrape any of the job sites. Last error: {last_error}")
+        
+        return _merge_extracts(extracts)
+
+    def _scrape_url(self, url: str, params: Dict) -> Dict:
+        """FirecrawlApp.scrape_url over the pooled session, so a 429 is retried by _with_backoff"""
+        response = self.firecrawl._post_request(
+            f"{self.firecrawl.api_url}/v1/scrape",
+            {'url': url, **params},
+            self.firecrawl._prepare_headers()
+        )
+        if response.status_code != 200:
+            self.firecrawl._handle_error(response, 'scrape URL')
+        data = response.json()
+        if not data.get('success') or 'data' not in data:
+            raise Exception(f"Failed to scrape URL. Error: {data.get('error', data)}")
+        return data['data']
+
+    def find_jobs(
+        self, 
+        job_title: str,
+        location: str,
+        experience_years: int,
+        skills: List[str],
+        jobs: List[Dict],
+        usage: Optional[UsageMetrics] = None
+    ) -> Union[JobAnalysis, str]:
+        """Analyze scraped jobs based on user preferences, returning a message instead when that isn't possible"""
+        skills_string = ", ".join(skills)
         
-        print(f"Searching for industry trends with URLs: {urls}")
+        if not jobs:
+            return "No job listings found matching your criteria. Try adjusting your search parameters or try different job sites."
         
         try:
-            raw_response = self.firecrawl.extract(
-                urls=urls,
-                params={
-                    'prompt': f"""Extract industry trends data for the {job_category} industry. 
-                    
-                    For each industry trend, extract:
-                    - industry: The specific industry or sub-category
-                    - avg_salary: The average salary in this industry (as a number)
-                    - growth_rate: The growth rate of this industry (as a number)
-                    - demand_level: The demand level (e.g., "High", "Medium", "Low")
-                    - top_skills: A list of top skills in demand for this industry
-                    
-                    IMPORTANT: 
-                    - Extract data for at least 3-5 different roles or sub-categories within this industry
-                    - Include salary trends, growth rate, and demand level
-                    - Identify top skills in demand for this industry
-                    """,
-                    'schema': IndustryTrendsSchema.model_json_schema(),
-                }
+            return self._run_structured(
+                self.agent,
+                JOB_ANALYSIS_PROMPT.format(
+                    jobs=self._compact(jobs),
+                    job_title=job_title,
+                    location=location,
+                    experience_years=experience_years,
+                    skills=skills_string
+                ),
+                usage=usage
             )
-            
-            print("Raw Industry Trends Response:", raw_response)
-            
-            if isinstance(raw_response, dict) and raw_response.get('success'):
-                industries = raw_response['data'].get('industry_trends', [])
+        except Exception as e:
+            logger.error("Error in find_jobs: %s", e)
+            return f"An error occurred while analyzing jobs: {str(e)}\n\nPlease try again with different search parameters."
+
+    def get_industry_trends(
+        self,
+        job_category: str,
+        industries: List[Dict],
+        stream: bool = True,
+        usage: Optional[UsageMetrics] = None
+    ) -> Iterator[str]:
+        """Analyze scraped trends for the specified job category/industry, yielding the analysis as it is generated"""
+        if not industries:
+            yield f"No industry trends data available for {job_category}. Try a different industry category."
+            return
         
-                if not industries:
-                    return f"No industry trends data available for {job_category}. Try a different industry category."
-                
-                analysis = self.agent.run(
-                    f"""As a career expert, analyze these industry trends for {job_category}:
-
-                    {industries}
-
-                    Please provide:
-                    1. A bullet-point summary of the salary and demand trends
-                    2. Identify the top skills in demand for this industry
-                    3. Career growth opportunities:
-                       - Roles with highest growth potential
-                       - Emerging specializations
-                       - Skills with increasing demand
-                    4. Specific advice for job seekers based on these trends
-
-                    Format the response as follows:
-                    
-                    📊 INDUSTRY TRENDS SUMMARY
-                    • [Bullet points for salary and demand trends]
-
-                    🔥 TOP SKILLS IN DEMAND
-                    • [Bullet points for most sought-after skills]
-
-                    📈 CAREER GROWTH OPPORTUNITIES
-                    • [Bullet points with growth insights]
-
-                    🎯 RECOMMENDATIONS FOR JOB SEEKERS
-                    • [Bullet points with specific advice]
-                    """
-                )
-                
-                return analysis.content
-            
-            return f"No industry trends data available for {job_category}. Try a different industry category."
+        try:
+            yield from self._stream_content(
+                self.trends_agent,
+                TRENDS_ANALYSIS_PROMPT.format(industries=self._compact(industries), job_category=job_category),
+                stream=stream,
+                usage=usage
+            )
         except Exception as e:
-            print(f"Error in get_industry_trends: {str(e)}")
-            return f"An error occurred while fetching industry trends: {str(e)}\n\nPlease try again with a different industry category or check if the sites are supported by Firecrawl."
+            logger.error("Error in get_industry_trends: %s", e)
+            yield f"An error occurred while analyzing industry trends: {str(e)}\n\nPlease try again with a different industry category."
+
+@st.cache_resource
+def get_transport(firecrawl_api_key: str) -> Tuple["httpx.Client", "FirecrawlApp"]:
+    """Build the pooled OpenAI client and Firecrawl app once per Firecrawl key, shared across reruns and sessions
+
+    Only the connections are shared; the agno agents keep per-run memory, so each run builds its own.
+    """
+    http_client = create_http_client()
+    firecrawl = create_firecrawl_app(firecrawl_api_key)
+    # Pay the TLS handshakes in the background while the user fills in the search form
+    threading.Thread(target=warm_up, args=(firecrawl, http_client), daemon=True).start()
+    return http_client, firecrawl
+
+def render_job_analysis(analysis: JobAnalysis) -> None:
+    """Render a structured job analysis under the app's fixed section headers"""
+    st.subheader("💼 SELECTED JOB OPPORTUNITIES")
+    for job in analysis.selected:
+        lines = [f"**{job.job_title}** · {job.role}  ", f"📍 {job.region} · 🧭 {job.experience}", ""]
+        lines += [f"- ✅ {pro}" for pro in job.pros]
+        lines += [f"- ⚠️ {con}" for con in job.cons]
+        if job.job_link:
+            lines += ["", f"[View job posting]({job.job_link})"]
+        st.markdown("\n".join(lines))
+    
+    st.subheader("🔍 SKILLS MATCH ANALYSIS")
+    st.markdown("\n".join(f"- {point}" for point in analysis.skills_match))
+    
+    st.subheader("💡 RECOMMENDATIONS")
+    st.markdown("\n".join(f"- {point}" for point in analysis.recommendations))
+    
+    st.subheader("📝 APPLICATION TIPS")
+    st.markdown("\n".join(f"- {tip}" for tip in analysis.tips))
+
+def sleep_with_progress(seconds: float) -> None:
+    """Wait out a Firecrawl rate limit backoff while showing a progress bar"""
+    text = f"⏳ Firecrawl rate limit reached, retrying in {seconds:.0f}s..."
+    progress = st.progress(0.0, text=text)
+    steps = max(1, int(seconds * 4))
+    for step in range(1, steps + 1):
+        time.sleep(seconds / steps)
+        progress.progress(step / steps, text=text)
+    progress.empty()
+
+def get_listings(job_agent: JobHuntingAgent, **criteria) -> Dict[str, List[Dict]]:
+    """Return scraped listings for these criteria, reusing this session's last search when it is still fresh"""
+    last_jobs = st.session_state.get('last_jobs')
+    if last_jobs and last_jobs['criteria'] == criteria and time.time() - last_jobs['fetched_at'] < CACHE_TTL:
+        return last_jobs['listings']
+    
+    listings = job_agent.search(**criteria, sleep=sleep_with_progress)
+    st.session_state['last_jobs'] = {'criteria': criteria, 'listings': listings, 'fetched_at': time.time()}
+    return listings
 
-def create_job_agent():
+def create_job_agent() -> JobHuntingAgent:
     """Create JobHuntingAgent with API keys from session state"""
-    if 'job_agent' not in st.session_state:
-        st.session_state.job_agent = JobHuntingAgent(
-            firecrawl_api_key=st.session_state.firecrawl_key,
-            openai_api_key=st.session_state.openai_key,
-            model_id=st.session_state.model_id
-        )
+    http_client, firecrawl = get_transport(st.session_state.firecrawl_key)
+    return JobHuntingAgent(
+        firecrawl_api_key=st.session_state.firecrawl_key,
+        openai_api_key=st.session_state.openai_key,
+        model_id=st.session_state.model_id,
+        http_client=http_client,
+        firecrawl=firecrawl
+    )
 
 def main():
     st.set_page_config(
@@ -254,7 +828,7 @@ def main():
     # Get API keys from environment variables
     env_firecrawl_key = os.getenv("FIRECRAWL_API_KEY", "")
     env_openai_key = os.getenv("OPENAI_API_KEY", "")
-    default_model = os.getenv("OPENAI_MODEL_ID", "o3-mini")
+    default_model = os.getenv("OPENAI_MODEL_ID", MODEL_OPTIONS[0])
 
     with st.sidebar:
         st.title("🔑 API Configuration")
@@ -262,12 +836,17 @@ def main():
         st.subheader("🤖 Model Selection")
         model_id = st.selectbox(
             "Choose OpenAI Model",
-            options=["o3-mini", "gpt-4o-mini"],
-            index=0 if default_model == "o3-mini" else 1,
-            help="Select the AI model to use. Choose gpt-4o if your api doesn't have access to o3-mini"
+            options=MODEL_OPTIONS,
+            index=MODEL_OPTIONS.index(default_model) if default_model in MODEL_OPTIONS else 0,
+            help="Select the AI model to use. gpt-4o-mini is fastest for this analysis; o3-mini runs with low reasoning effort"
         )
         st.session_state.model_id = model_id
         
+        if st.button("🔄 Refresh cache", help="Discard cached job listings and analyses and scrape the sites again"):
+            cache.clear()
+            st.session_state.pop('last_jobs', None)
+            st.success("✅ Cache cleared")
+        
         st.divider()
         
         st.subheader("🔐 API Keys")
@@ -299,7 +878,6 @@ def main():
         if firecrawl_key and openai_key:
             st.session_state.firecrawl_key = firecrawl_key
             st.session_state.openai_key = openai_key
-            create_job_agent()
         else:
             missing_keys = []
             if not firecrawl_key:
@@ -369,8 +947,12 @@ def main():
         help="Select the industry or job category you're interested in"
     )
 
+    if firecrawl_key and openai_key:
+        # The form is already drawn, so opening the pooled connections here doesn't delay first paint
+        get_transport(firecrawl_key)
+
     if st.button("🔍 Start Job Search", use_container_width=True):
-        if 'job_agent' not in st.session_state:
+        if not (firecrawl_key and openai_key):
             st.error("⚠️ Please enter your API keys in the sidebar first!")
             return
             
@@ -382,32 +964,62 @@ def main():
             st.warning("⚠️ No skills provided. Adding skills will improve job matching.")
             
         try:
-            with st.spinner("🔍 Searching for jobs..."):
-                job_results = st.session_state.job_agent.find_jobs(
+            # Agents are built per search so concurrent sessions never share agno run state
+            job_agent = create_job_agent()
+            
+            with st.spinner("🌐 Scraping job sites and industry data..."):
+                listings = get_listings(
+                    job_agent,
                     job_title=job_title,
                     location=location,
                     experience_years=experience_years,
-                    skills=skills
+                    skills=skills,
+                    job_category=job_category
                 )
                 
-                if "An error occurred" in job_results:
-                    st.error(job_results)
-                else:
-                    st.success("✅ Job search completed!")
-                    st.subheader("💼 Job Recommendations")
-                    st.markdown(job_results)
-                    
-                    st.divider()
-                    
+            # The structured job analysis can't stream, so run it in the background while the trends stream
+            job_usage = UsageMetrics()
+            trends_usage = UsageMetrics()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                job_future = executor.submit(
+                    job_agent.find_jobs,
+                    job_title=job_title,
+                    location=location,
+                    experience_years=experience_years,
+                    skills=skills,
+                    jobs=listings['job_postings'],
+                    usage=job_usage
+                )
+                
+                job_container = st.container()
+                
+                st.divider()
+                
+                with st.expander(f"📈 {job_category} Industry Trends Analysis", expanded=True):
+                    trends_placeholder = st.empty()
                     with st.spinner("📊 Analyzing industry trends..."):
-                        industry_trends = st.session_state.job_agent.get_industry_trends(job_category)
+                        industry_trends = trends_placeholder.write_stream(
+                            job_agent.get_industry_trends(job_category, listings['industry_trends'], usage=trends_usage)
+                        )
+                        
+                    if "An error occurred" in industry_trends:
+                        trends_placeholder.error(industry_trends)
+                    else:
+                        st.caption(trends_usage.summary())
+                        st.success("✅ Industry analysis completed!")
+                        
+                with job_container:
+                    with st.spinner("🔍 Analyzing jobs..."):
+                        job_results = job_future.result()
                         
-                        if "An error occurred" in industry_trends:
-                            st.error(industry_trends)
-                        else:
-                            st.success("✅ Industry analysis completed!")
-                            with st.expander(f"📈 {job_category} Industry Trends Analysis"):
-                                st.markdown(industry_trends)
+                    if isinstance(job_results, JobAnalysis):
+                        render_job_analysis(job_results)
+                        st.caption(job_usage.summary())
+                        st.success("✅ Job search completed!")
+                    elif "An error occurred" in job_results:
+                        st.error(job_results)
+                    else:
+                        st.info(job_results)
                 
         except Exception as e:
             error_message = str(e)